@@ -1,7 +1,7 @@
 from .kinetic_model import KineticModel
 from .rate_constant import RateConstant
 from .solver import Solver
-from .stimulation import Stimulation
+from .stimulation import CustomStimulation, ExpDecayStimulation, Stimulation
 from .transition import Transition
 from .transition_state import TransitionState
 
@@ -0,0 +1,821 @@
+"""Numerical kernels used by kineuron.Solver to evolve the kinetic model.
+
+The kernels operate only on NumPy arrays, so they can be compiled with Numba
+when it is installed. Without Numba the τ-leaping kernel runs as plain Python
+code, but the Gillespie kernel is too slow on NumPy scalars. When it cannot be
+compiled, the Solver runs gillespie_python instead. It is a separate port of
+the Gillespie kernel to lists and Python floats. Both versions must be changed
+together, and tests/test_kernels.py checks that their trajectories stay
+identical.
+"""
+import math
+
+import numpy as np
+
+try:
+    from numba import cfunc, get_num_threads, njit, prange
+    from numba.typed import List
+
+    NUMBA_AVAILABLE = True
+
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+    List = list
+
+    def get_num_threads() -> int:
+        """Replaces numba.get_num_threads when Numba is not installed."""
+        return 1
+
+    def njit(*args, **kwargs):
+        """Replaces numba.njit when Numba is not installed, returning the
+        decorated function unchanged."""
+        def decorator(func):
+            func.py_func = func
+            return func
+
+        if len(args) == 1 and callable(args[0]):
+            return decorator(args[0])
+
+        return decorator
+
+    def cfunc(signature, **kwargs):
+        """Replaces numba.cfunc when Numba is not installed, returning the
+        decorated function unchanged."""
+        return njit(**kwargs)
+
+
+# -----------------------------------------------------------------------------
+# Signatures of the compiled stimulation and propensity functions. The kernels
+# receive them as C callbacks of a fixed type, so they are not specialized for
+# each protocol or model and are cached on disk between sessions.
+# -----------------------------------------------------------------------------
+STIMULI_SIGNATURE = "float64(float64)"
+PROPENSITIES_SIGNATURE = \
+    "float64(int64[::1], float64[::1], float64, float64[::1])"
+
+
+@njit(cache=True)
+def exponential_decay(t: float, onsets: np.ndarray, inv_tau: float,
+                      intensity_stimulus: float) -> float:
+    """Stimulation protocol with exponential stimulus decay profile.
+
+    Parameters
+    ----------
+    t : float
+        Time variable within the model simulation.
+    onsets : numpy.ndarray
+        Sorted times at which each stimulus starts, i.e. the conditional
+        stimuli followed by the test stimulus.
+    inv_tau : float
+        Inverse of the time constant of the duration of each stimulus.
+    intensity_stimulus : float
+        Intensity of each stimulus.
+
+    Return
+    ------
+    float
+        The stimulus value at time t.
+    """
+    # -------------------------------------------------------------------------
+    # All the stimuli have the same exponential profile. Only the time elapsed
+    # since the last onset is needed, which is found by a binary search.
+    # -------------------------------------------------------------------------
+    i = np.searchsorted(onsets, t, side='right')
+
+    if i == 0:
+        return 0.0
+
+    return intensity_stimulus * math.exp(-(t - onsets[i - 1]) * inv_tau)
+
+
+@njit(cache=True, fastmath=True)
+def exponential_decay_array(t: np.ndarray, onsets: np.ndarray, inv_tau: float,
+                            intensity_stimulus: float) -> np.ndarray:
+    """Evaluates the exponential decay protocol over an array of times, with
+    a single exponential computed per element.
+
+    Parameters
+    ----------
+    t : numpy.ndarray
+        Array of times within the model simulation.
+
+    See kineuron._kernels.exponential_decay for the rest of the parameters.
+
+    Return
+    ------
+    numpy.ndarray
+        The stimulus values at the times t.
+    """
+    i = np.searchsorted(onsets, t, side='right')
+    stimulated = i > 0
+
+    # -------------------------------------------------------------------------
+    # Before the stimulation the exponent is left at zero, so the masked-out
+    # elements never overflow.
+    # -------------------------------------------------------------------------
+    elapsed = np.where(stimulated, t - onsets[np.maximum(i - 1, 0)], 0.0)
+
+    return np.where(stimulated,
+                    intensity_stimulus * np.exp(-elapsed * inv_tau), 0.0)
+
+
+def compile_exponential_decay(onsets: np.ndarray, inv_tau: float,
+                              intensity_stimulus: float):
+    """Builds a compiled function f(t) of the exponential decay protocol with
+    its parameters fixed, that can be passed to the Gillespie kernels. It is
+    a C callback, so the kernels are compiled once for all the protocols.
+    """
+    @cfunc(STIMULI_SIGNATURE)
+    def stimuli(t: float) -> float:
+        return exponential_decay(t, onsets, inv_tau, intensity_stimulus)
+
+    return stimuli
+
+
+@njit(cache=True)
+def interpolate(t: float, table: np.ndarray, inv_step: float) -> float:
+    """Linear interpolation of a function tabulated on a regular grid that
+    starts at zero.
+
+    Parameters
+    ----------
+    t : float
+        Time variable within the model simulation.
+    table : numpy.ndarray
+        Values of the function at times 0, step, 2 * step, ...
+    inv_step : float
+        Inverse of the step of the grid.
+
+    Return
+    ------
+    float
+        The interpolated value at time t. Beyond the grid, the last value of
+        the table is returned.
+    """
+    x = t * inv_step
+    i = int(x)
+
+    if i >= table.shape[0] - 1:
+        return table[table.shape[0] - 1]
+
+    return table[i] + (x - i) * (table[i + 1] - table[i])
+
+
+def compile_interpolation(table: np.ndarray, inv_step: float):
+    """Builds a compiled function f(t) that interpolates a tabulated
+    stimulation protocol, that can be passed to the Gillespie kernels as a C
+    callback.
+    """
+    @cfunc(STIMULI_SIGNATURE)
+    def stimuli(t: float) -> float:
+        return interpolate(t, table, inv_step)
+
+    return stimuli
+
+
+@cfunc(STIMULI_SIGNATURE, cache=True)
+def no_stimuli(t: float) -> float:
+    """Null stimulation protocol, passed to the kernels when no transition
+    depends on the stimulus, so that customized protocols do not force the
+    simulation out of the compiled kernels.
+    """
+    return 0.0
+
+
+# -----------------------------------------------------------------------------
+# Compiled propensity functions, indexed by the topology of the model, so each
+# model shape is generated and compiled only once per session.
+# -----------------------------------------------------------------------------
+_PROPENSITIES = {}
+
+
+def compile_propensities(origin: np.ndarray, calcium_dependent: np.ndarray):
+    """Generates a function a0 = f(state, rates, stimulus, a) specialized for
+    the shape of the model, that computes the propensity of each transition
+    in 'a' and returns their sum. The loop over the transitions is unrolled,
+    with the index of the source states as literals and the stimulus only
+    added to the calcium-dependent transitions. Models with more transitions
+    than FENWICK_THRESHOLD are not unrolled, since the generated code would
+    take too long to compile, and the kernels use
+    kineuron._kernels.propensities_loop instead.
+
+    Parameters
+    ----------
+    origin : numpy.ndarray
+        Index of the source transition state of each transition.
+    calcium_dependent : numpy.ndarray
+        Flags of the transitions whose rate constant includes the stimulus.
+
+    Return
+    ------
+    function
+        Compiled C callback when Numba is installed, with the plain Python
+        function in its 'py_func' attribute. Otherwise, the plain Python
+        function. For large models, kineuron._kernels.looped_propensities.
+    """
+    if origin.shape[0] > FENWICK_THRESHOLD:
+        return looped_propensities
+
+    key = (tuple(origin.tolist()), tuple(calcium_dependent.tolist()))
+
+    if key not in _PROPENSITIES:
+        lines = ["def propensities(state, rates, stimulus, a):"]
+
+        for j, (i, dependent) in enumerate(zip(*key)):
+            rate = f"(rates[{j}] + stimulus)" if dependent else f"rates[{j}]"
+            lines.append(f"    a[{j}] = {rate} * state[{i}]")
+
+        total = " + ".join(f"a[{j}]" for j in range(len(key[0])))
+        lines.append(f"    return {total or '0.0'}")
+
+        namespace = {}
+        exec("\n".join(lines), namespace)
+        function = namespace["propensities"]
+        _PROPENSITIES[key] = cfunc(PROPENSITIES_SIGNATURE)(function)
+        _PROPENSITIES[key].py_func = function
+
+    return _PROPENSITIES[key]
+
+
+@njit(cache=True)
+def propensities_loop(state: np.ndarray, origin: np.ndarray,
+                      rates: np.ndarray, calcium_dependent: np.ndarray,
+                      stimulus: float, a: np.ndarray) -> float:
+    """Computes the propensity of each transition in 'a' and returns their
+    sum, in the same order as the unrolled functions of
+    kineuron._kernels.compile_propensities. It is used by the kernels in
+    the models with more transitions than FENWICK_THRESHOLD.
+    """
+    total = 0.0
+
+    for j in range(len(a)):
+        if calcium_dependent[j]:
+            a[j] = (rates[j] + stimulus) * state[origin[j]]
+        else:
+            a[j] = rates[j] * state[origin[j]]
+
+        total += a[j]
+
+    return total
+
+
+def _looped_propensities(state: np.ndarray, rates: np.ndarray,
+                         stimulus: float, a: np.ndarray) -> float:
+    """Placeholder passed to the kernels for the models whose propensities
+    are computed by kineuron._kernels.propensities_loop. It is never called.
+    """
+    return math.nan
+
+
+looped_propensities = cfunc(PROPENSITIES_SIGNATURE,
+                            cache=True)(_looped_propensities)
+looped_propensities.py_func = _looped_propensities
+
+
+# -----------------------------------------------------------------------------
+# Models with more transitions than this threshold select the next transition
+# with a Fenwick tree of propensities, updating only the propensities that
+# change between steps. For smaller models a full recomputation is faster.
+# The same threshold bounds the size of the unrolled propensity functions.
+# -----------------------------------------------------------------------------
+FENWICK_THRESHOLD = 16
+FENWICK_REBUILD = 1024
+
+# -----------------------------------------------------------------------------
+# Number of uniform random values drawn at once by the Gillespie kernel. It
+# must be even, since each step uses two of them.
+# -----------------------------------------------------------------------------
+RANDOM_BLOCK = 4096
+
+
+@njit(cache=True)
+def fenwick_build(values: np.ndarray, tree: np.ndarray) -> None:
+    """Builds in place a Fenwick tree (binary indexed tree) of the values.
+    The tree has one more element than the values and is indexed from one.
+    """
+    tree[0] = 0.0
+    tree[1:] = values
+    n = len(tree)
+
+    for i in range(1, n):
+        j = i + (i & -i)
+
+        if j < n:
+            tree[j] += tree[i]
+
+
+@njit(cache=True)
+def fenwick_update(tree: np.ndarray, i: int, delta: float) -> None:
+    """Adds delta to the i-th value (indexed from zero) of the Fenwick tree.
+    """
+    i += 1
+    n = len(tree)
+
+    while i < n:
+        tree[i] += delta
+        i += i & -i
+
+
+@njit(cache=True)
+def fenwick_total(tree: np.ndarray) -> float:
+    """Returns the sum of all the values of the Fenwick tree."""
+    i = len(tree) - 1
+    total = 0.0
+
+    while i > 0:
+        total += tree[i]
+        i -= i & -i
+
+    return total
+
+
+@njit(cache=True)
+def fenwick_search(tree: np.ndarray, value: float) -> int:
+    """Returns the index (from zero) of the first value whose cumulative sum
+    is greater than the given value.
+    """
+    n = len(tree) - 1
+    step = 1
+
+    while 2 * step <= n:
+        step *= 2
+
+    pos = 0
+    while step > 0:
+        if pos + step <= n and tree[pos + step] <= value:
+            pos += step
+            value -= tree[pos]
+
+        step //= 2
+
+    return min(pos, n - 1)
+
+
+@njit(cache=True, nogil=True)
+def gillespie(state: np.ndarray, origin: np.ndarray, destination: np.ndarray,
+              rates: np.ndarray, calcium_dependent: np.ndarray, stimuli,
+              propensities, time_save: float,
+              generator: np.random.Generator, out: np.ndarray) -> None:
+    """Simulates a single trajectory of the model with the Gillespie
+    Stochastic Algorithm (1977). Any change must also be made in
+    kineuron._kernels.gillespie_python.
+
+    Parameters
+    ----------
+    state : numpy.ndarray
+        Number of vesicles in each transition state. It is updated in place,
+        so at the end it holds the final state of the trajectory.
+    origin, destination : numpy.ndarray
+        Index of the source and destination transition state of each
+        transition.
+    rates : numpy.ndarray
+        Value of the rate constant of each transition.
+    calcium_dependent : numpy.ndarray
+        Flags of the transitions whose rate constant includes the stimulus.
+    stimuli : function
+        Function f(t) that returns the stimulus value at time t.
+    propensities : function
+        Function of the model built by
+        kineuron._kernels.compile_propensities.
+    time_save : float
+        Interval of seconds in which the instantaneous state of the model
+        is saved periodically.
+    generator : numpy.random.Generator
+        Random number generator of this trajectory.
+    out : numpy.ndarray
+        Array of shape (samples, states + transitions) where the number of
+        vesicles in each state and the number of events of each transition
+        between samples are saved.
+    """
+    n_states = state.shape[0]
+    n_transitions = rates.shape[0]
+    n_samples = out.shape[0]
+
+    a = np.zeros(n_transitions)
+    events = np.zeros(n_transitions, dtype=np.int64)
+    stimulated = np.nonzero(calcium_dependent)[0]
+
+    # -------------------------------------------------------------------------
+    # Large models keep a Fenwick tree of the propensities. After each event
+    # only the transitions leaving the two states involved and the
+    # calcium-dependent transitions change their propensity.
+    # -------------------------------------------------------------------------
+    use_tree = n_transitions > FENWICK_THRESHOLD
+    tree = np.zeros(n_transitions + 1)
+
+    leaving = np.argsort(origin, kind='mergesort')
+    leaving_start = np.zeros(n_states + 1, dtype=np.int64)
+    for j in range(n_transitions):
+        leaving_start[origin[j] + 1] += 1
+    leaving_start = np.cumsum(leaving_start)
+
+    # -------------------------------------------------------------------------
+    # The total of the tree accumulates rounding errors from the updates. Any
+    # possible transition contributes at least its rate constant, so a total
+    # below half of the smallest rate is recomputed exactly.
+    # -------------------------------------------------------------------------
+    positive = rates[rates > 0.0]
+    a0_floor = 0.5 * positive.min() if positive.shape[0] > 0 else np.inf
+
+    # -------------------------------------------------------------------------
+    # Each step consumes two uniform random values. They are drawn in blocks,
+    # which is the same sequence as drawing them one by one.
+    # -------------------------------------------------------------------------
+    uniforms = generator.random(RANDOM_BLOCK)
+    iu = 0
+
+    t = 0.0
+    isave = 0
+    k = -1
+    step = 0
+    last_stimulus = np.nan
+
+    while isave < n_samples:
+        # ---------------------------------------------------------------------
+        # Propensity values are computed for each transition, including the
+        # contribution of the stimulation.
+        # ---------------------------------------------------------------------
+        stimulus = stimuli(t) if stimulated.shape[0] > 0 else 0.0
+
+        if use_tree and k >= 0 and step % FENWICK_REBUILD != 0:
+            # -----------------------------------------------------------------
+            # The calcium-dependent propensities are only recomputed when the
+            # stimulus changes, e.g. not before the stimulation starts.
+            # -----------------------------------------------------------------
+            if stimulus != last_stimulus:
+                for j in stimulated:
+                    value = (rates[j] + stimulus) * state[origin[j]]
+                    fenwick_update(tree, j, value - a[j])
+                    a[j] = value
+
+            for i in (origin[k], destination[k]):
+                for j in leaving[leaving_start[i]:leaving_start[i + 1]]:
+                    if calcium_dependent[j]:
+                        value = (rates[j] + stimulus) * state[i]
+                    else:
+                        value = rates[j] * state[i]
+
+                    fenwick_update(tree, j, value - a[j])
+                    a[j] = value
+
+            a0 = fenwick_total(tree)
+
+            if a0 < a0_floor:
+                a0 = propensities_loop(state, origin, rates,
+                                       calcium_dependent, stimulus, a)
+                fenwick_build(a, tree)
+
+        elif use_tree:
+            a0 = propensities_loop(state, origin, rates, calcium_dependent,
+                                   stimulus, a)
+            fenwick_build(a, tree)
+
+        else:
+            a0 = propensities(state, rates, stimulus, a)
+
+        last_stimulus = stimulus
+
+        # ---------------------------------------------------------------------
+        # Without any possible transition the state no longer changes, so it
+        # is saved in all the remaining samples. Both the unrolled sum and the
+        # recomputed total of the tree are exact here, so the comparison does
+        # not depend on how a0 was obtained.
+        # ---------------------------------------------------------------------
+        if a0 <= 0.0:
+            out[isave:, :n_states] = state
+            out[isave, n_states:] = events
+            out[isave + 1:, n_states:] = 0
+            break
+
+        step += 1
+
+        if iu == RANDOM_BLOCK:
+            uniforms = generator.random(RANDOM_BLOCK)
+            iu = 0
+
+        # ---------------------------------------------------------------------
+        # The waiting time is exponential with rate a0. It is sampled by
+        # inversion from one uniform draw, which is cheaper than drawing it
+        # with generator.exponential in the compiled kernel.
+        # ---------------------------------------------------------------------
+        t = t - math.log(uniforms[iu]) / a0
+
+        # ---------------------------------------------------------------------
+        # The instantaneous state of the model is saved in all the samples
+        # reached by the new time. The transition events are only counted in
+        # the first of them.
+        # ---------------------------------------------------------------------
+        target = min(n_samples, int(t / time_save) + 1)
+
+        if target > isave:
+            out[isave:target, :n_states] = state
+            out[isave, n_states:] = events
+            out[isave + 1:target, n_states:] = 0
+            events[:] = 0
+            isave = target
+
+        # ---------------------------------------------------------------------
+        # The next transition is chosen randomly and executed. In small models
+        # its index is the number of partial sums of the propensities that do
+        # not exceed the random value, counted without branches.
+        # ---------------------------------------------------------------------
+        random_a0 = uniforms[iu + 1] * a0
+        iu += 2
+
+        if use_tree:
+            k = fenwick_search(tree, random_a0)
+
+        if not use_tree or a[k] == 0.0:
+            k = 0
+            partial = 0.0
+
+            for j in range(n_transitions - 1):
+                partial += a[j]
+                k += partial <= random_a0
+
+        # ---------------------------------------------------------------------
+        # If rounding pushed the random value past the last possible
+        # transition, the previous one with vesicles in its source is taken.
+        # ---------------------------------------------------------------------
+        while k > 0 and a[k] <= 0.0:
+            k -= 1
+
+        if state[origin[k]] == 0:
+            continue
+
+        state[origin[k]] -= 1
+        state[destination[k]] += 1
+        events[k] += 1
+
+
+def gillespie_python(state: np.ndarray, origin: np.ndarray,
+                     destination: np.ndarray, rates: np.ndarray,
+                     calcium_dependent: np.ndarray, stimuli, propensities,
+                     time_save: float, generator: np.random.Generator,
+                     out: np.ndarray) -> None:
+    """Port of kineuron._kernels.gillespie to lists and Python floats, used
+    when the kernel cannot be compiled. Outside Numba they are much faster
+    than NumPy scalars. The two functions are kept separately, so any change
+    to one of them must be made in the other. With the same generator, both
+    give the same trajectory.
+
+    Parameters
+    ----------
+    propensities : function
+        Plain Python function of the model built by
+        kineuron._kernels.compile_propensities, i.e. its 'py_func'.
+
+    See kineuron._kernels.gillespie for the rest of the parameters.
+    """
+    n_states = state.shape[0]
+    n_transitions = rates.shape[0]
+    n_samples = out.shape[0]
+
+    a = [0.0] * n_transitions
+    events = [0] * n_transitions
+    stimulated = np.nonzero(calcium_dependent)[0].tolist()
+
+    # -------------------------------------------------------------------------
+    # Large models keep a Fenwick tree of the propensities, as in the compiled
+    # kernel. The transitions leaving each state are grouped beforehand.
+    # -------------------------------------------------------------------------
+    use_tree = n_transitions > FENWICK_THRESHOLD
+    tree = [0.0] * (n_transitions + 1)
+
+    leaving = np.argsort(origin, kind='mergesort')
+    leaving_start = np.searchsorted(origin[leaving], np.arange(n_states + 1))
+    leaving = [leaving[leaving_start[i]:leaving_start[i + 1]].tolist()
+               for i in range(n_states)]
+
+    build, update = fenwick_build.py_func, fenwick_update.py_func
+    total, search = fenwick_total.py_func, fenwick_search.py_func
+    loop = propensities_loop.py_func
+
+    positive = rates[rates > 0.0]
+    a0_floor = 0.5 * positive.min() if positive.shape[0] > 0 else math.inf
+
+    counts = state.tolist()
+    origin = origin.tolist()
+    destination = destination.tolist()
+    rates = rates.tolist()
+    calcium_dependent = calcium_dependent.tolist()
+
+    uniforms = generator.random(RANDOM_BLOCK).tolist()
+    iu = 0
+
+    t = 0.0
+    isave = 0
+    k = -1
+    step = 0
+    last_stimulus = math.nan
+
+    while isave < n_samples:
+        stimulus = stimuli(t) if stimulated else 0.0
+
+        if use_tree and k >= 0 and step % FENWICK_REBUILD != 0:
+            if stimulus != last_stimulus:
+                for j in stimulated:
+                    value = (rates[j] + stimulus) * counts[origin[j]]
+                    update(tree, j, value - a[j])
+                    a[j] = value
+
+            for i in (origin[k], destination[k]):
+                for j in leaving[i]:
+                    if calcium_dependent[j]:
+                        value = (rates[j] + stimulus) * counts[i]
+                    else:
+                        value = rates[j] * counts[i]
+
+                    update(tree, j, value - a[j])
+                    a[j] = value
+
+            a0 = total(tree)
+
+            if a0 < a0_floor:
+                a0 = loop(counts, origin, rates, calcium_dependent, stimulus,
+                          a)
+                build(a, tree)
+
+        elif use_tree:
+            a0 = loop(counts, origin, rates, calcium_dependent, stimulus, a)
+            build(a, tree)
+
+        else:
+            a0 = propensities(counts, rates, stimulus, a)
+
+        last_stimulus = stimulus
+
+        if a0 <= 0.0:
+            out[isave:, :n_states] = counts
+            out[isave, n_states:] = events
+            out[isave + 1:, n_states:] = 0
+            break
+
+        step += 1
+
+        if iu == RANDOM_BLOCK:
+            uniforms = generator.random(RANDOM_BLOCK).tolist()
+            iu = 0
+
+        t = t - math.log(uniforms[iu]) / a0
+
+        target = min(n_samples, int(t / time_save) + 1)
+
+        if target > isave:
+            out[isave:target, :n_states] = counts
+            out[isave, n_states:] = events
+            out[isave + 1:target, n_states:] = 0
+            events = [0] * n_transitions
+            isave = target
+
+        # ---------------------------------------------------------------------
+        # The partial sums never decrease, so stopping at the first one that
+        # exceeds the random value gives the same index as the branchless
+        # count of the compiled kernel.
+        # ---------------------------------------------------------------------
+        random_a0 = uniforms[iu + 1] * a0
+        iu += 2
+
+        if use_tree:
+            k = search(tree, random_a0)
+
+        if not use_tree or a[k] == 0.0:
+            k = n_transitions - 1
+            partial = 0.0
+
+            for j in range(n_transitions - 1):
+                partial += a[j]
+
+                if partial > random_a0:
+                    k = j
+                    break
+
+        while k > 0 and a[k] <= 0.0:
+            k -= 1
+
+        if counts[origin[k]] == 0:
+            continue
+
+        counts[origin[k]] -= 1
+        counts[destination[k]] += 1
+        events[k] += 1
+
+    state[:] = counts
+
+
+@njit(cache=True, nogil=True)
+def tau_leap(state: np.ndarray, origin: np.ndarray, destination: np.ndarray,
+             rates: np.ndarray, calcium_dependent: np.ndarray, stimuli,
+             propensities, time_save: float, tau: float,
+             generator: np.random.Generator, out: np.ndarray) -> None:
+    """Simulates a single trajectory of the model with the τ-leaping method
+    (Gillespie, 2001). In each leap of duration tau, the number of events of
+    each transition is drawn from a Poisson distribution. If a leap would
+    leave a state with a negative number of vesicles, the leap is halved.
+
+    Parameters
+    ----------
+    tau : float
+        Maximum duration of each leap.
+
+    See kineuron._kernels.gillespie for the rest of the parameters.
+    """
+    n_states = state.shape[0]
+    n_transitions = rates.shape[0]
+    n_samples = out.shape[0]
+
+    a = np.zeros(n_transitions)
+    k = np.zeros(n_transitions, dtype=np.int64)
+    new_state = np.empty(n_states, dtype=np.int64)
+    events = np.zeros(n_transitions, dtype=np.int64)
+
+    t = 0.0
+
+    for isave in range(n_samples):
+        out[isave, :n_states] = state
+        out[isave, n_states:] = events
+        events[:] = 0
+
+        time_next = (isave + 1) * time_save
+
+        while isave < n_samples - 1 and time_next - t > 1e-12 * time_save:
+            dt = min(tau, time_next - t)
+
+            if n_transitions > FENWICK_THRESHOLD:
+                propensities_loop(state, origin, rates, calcium_dependent,
+                                  stimuli(t), a)
+            else:
+                propensities(state, rates, stimuli(t), a)
+
+            # -----------------------------------------------------------------
+            # The number of events of each transition is drawn, halving the
+            # leap until no state is left with negative vesicles.
+            # -----------------------------------------------------------------
+            while True:
+                new_state[:] = state
+
+                for j in range(n_transitions):
+                    k[j] = generator.poisson(a[j] * dt)
+                    new_state[origin[j]] -= k[j]
+                    new_state[destination[j]] += k[j]
+
+                if new_state.min() >= 0:
+                    break
+
+                dt = 0.5 * dt
+
+            state[:] = new_state
+            events += k
+            t += dt
+
+        t = time_next
+
+
+@njit(cache=True, parallel=True)
+def tau_leap_repeat(state: np.ndarray, origin: np.ndarray,
+                    destination: np.ndarray, rates: np.ndarray,
+                    calcium_dependent: np.ndarray, stimuli, propensities,
+                    time_save: float, tau: float, generators: List,
+                    out: np.ndarray) -> None:
+    """Simulates independent trajectories of the model in parallel with the
+    τ-leaping method.
+
+    See kineuron._kernels.gillespie_repeat and kineuron._kernels.tau_leap
+    for the parameters.
+    """
+    for i in prange(out.shape[0]):
+        tau_leap(state[i], origin, destination, rates, calcium_dependent,
+                 stimuli, propensities, time_save, tau,
+                 generators[np.int64(i)], out[i])
+
+
+@njit(cache=True, parallel=True)
+def gillespie_repeat(state: np.ndarray, origin: np.ndarray,
+                     destination: np.ndarray, rates: np.ndarray,
+                     calcium_dependent: np.ndarray, stimuli, propensities,
+                     time_save: float, generators: List,
+                     out: np.ndarray) -> None:
+    """Simulates independent trajectories of the model in parallel.
+
+    Parameters
+    ----------
+    state : numpy.ndarray
+        Array of shape (repetitions, states) with the initial state of each
+        trajectory, updated in place with its final state.
+    generators : numba.typed.List
+        Random number generator of each trajectory.
+    out : numpy.ndarray
+        Array of shape (repetitions, samples, states + transitions) with the
+        results of each trajectory.
+
+    See kineuron._kernels.gillespie for the rest of the parameters.
+    """
+    # -------------------------------------------------------------------------
+    # The index of prange is unsigned, so it is converted before indexing the
+    # typed list.
+    # -------------------------------------------------------------------------
+    for i in prange(out.shape[0]):
+        gillespie(state[i], origin, destination, rates, calcium_dependent,
+                  stimuli, propensities, time_save, generators[np.int64(i)],
+                  out[i])
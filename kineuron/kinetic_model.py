@@ -1,7 +1,15 @@
-from graphviz import Digraph
+from itertools import chain
+
+import numpy as np
 
 from .neuromuscular import Synapse
 
+# -----------------------------------------------------------------------------
+# graphviz.Digraph is only imported the first time the graph of a model is
+# generated.
+# -----------------------------------------------------------------------------
+Digraph = None
+
 
 class KineticModel(Synapse):
     """Defines the kinetic model for modeling vesicle maturation transitions
@@ -24,6 +32,20 @@ class KineticModel(Synapse):
         Dictionary with the name and values of the kineuron.TransitionState
         objects defined in the model.
 
+    _counts : numpy.ndarray
+        Number of vesicles in each kineuron.TransitionState object, in the
+        order in which they were added to the model.
+
+    _origin, _destination : numpy.ndarray
+        Index in '_counts' of the source and destination
+        kineuron.TransitionState of each kineuron.Transition, in the order in
+        which they were added to the model. They are set by 'init'.
+
+    _rates, _calcium_dependent : numpy.ndarray
+        Value of the rate constant of each kineuron.Transition and whether it
+        is affected by the stimulation, in the same order. They are set by
+        'init' and rebuilt when the transitions change.
+
 
     Methods
     -------
@@ -94,6 +116,12 @@ class KineticModel(Synapse):
         self.__vesicles: int = vesicles
         self.__transitions: dict = None
         self.__transition_states: dict = None
+        self._counts: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._origin: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._destination: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._rates: np.ndarray = np.zeros(0, dtype=np.float64)
+        self._calcium_dependent: np.ndarray = np.zeros(0, dtype=np.bool_)
+        self.__graph = None
 
     def __dict_items(self, list_items: list) -> dict:
         """Auxiliary function to convert a list of items to a dictionary.
@@ -119,6 +147,17 @@ class KineticModel(Synapse):
             List of kineuron.TransitionState objects.
         """
         self.__transition_states: dict = self.__dict_items(transition_states)
+        self._counts = np.zeros(len(self.__transition_states), dtype=np.int64)
+
+        for i, state in enumerate(self.__transition_states.values()):
+            state._bind(self._counts, i)
+
+        # ---------------------------------------------------------------------
+        # The vesicles of the previous states are lost, so the model must be
+        # initialized again.
+        # ---------------------------------------------------------------------
+        self._init_flag = False
+        self._init_resting_state = False
 
     def add_transitions(self, transitions: list) -> None:
         """Adds a list of kineuron.Transition objects inside the model.
@@ -129,6 +168,10 @@ class KineticModel(Synapse):
             List of kineuron.Transition objects.
         """
         self.__transitions: dict = self.__dict_items(transitions)
+        self.__graph = None
+
+        if self._init_flag:
+            self.__index_transitions()
 
     def get_vesicles(self) -> int:
         """Returns the total number of vesicles simulated in the model.
@@ -172,7 +215,7 @@ class KineticModel(Synapse):
             Dictionary with the name of each kineuron.TransitionState and the
             number of vesicles in that state.
         """
-        return {name: item.get_vesicles() for name, item in self.__transition_states.items()}
+        return dict(zip(self.__transition_states, self._counts.tolist()))
 
     def __str__(self) -> str:
         """Builds a string with general information of the model.
@@ -194,8 +237,9 @@ class KineticModel(Synapse):
                "", "TRANSITION STATES".ljust(left) + "VESICLES"]
 
         if self.__transition_states is not None and self.__transitions is not None:
-            for _, item in {**self.__transition_states, **self.__transitions}.items():
-                msg.append(str(item))
+            msg.extend(str(item) for item in
+                       chain(self.__transition_states.values(),
+                             self.__transitions.values()))
 
         msg.append("".center(width, "="))
 
@@ -212,14 +256,49 @@ class KineticModel(Synapse):
         """
         print(self.__str__())
 
+    def __index_transitions(self) -> None:
+        """Auxiliary function that builds the arrays of the transitions used
+        by the kineuron.Solver, i.e. '_origin', '_destination', '_rates' and
+        '_calcium_dependent'.
+        """
+        # ---------------------------------------------------------------------
+        # The names of the source and destination states of the transitions
+        # are resolved once into indices of the array of counts.
+        # ---------------------------------------------------------------------
+        index = {name: i for i, name in enumerate(self.__transition_states)}
+
+        for transition in self.__transitions.values():
+            for name in (transition.get_origin(),
+                         transition.get_destination()):
+                if name not in index:
+                    message = f"'{name}' is not a defined name of any " + \
+                        "kineuron.TransitionState object in Model."
+                    raise ValueError(message)
+
+        self._origin = np.array([index[item.get_origin()] for item in
+                                 self.__transitions.values()], dtype=np.int64)
+        self._destination = np.array([index[item.get_destination()] for item
+                                      in self.__transitions.values()],
+                                     dtype=np.int64)
+
+        # ---------------------------------------------------------------------
+        # The rate constants are also gathered once into contiguous arrays.
+        # ---------------------------------------------------------------------
+        rate_constants = [item.get_rate_constant() for item in
+                          self.__transitions.values()]
+        self._rates = np.array([rate.get_rate() for rate in rate_constants],
+                               dtype=np.float64)
+        self._calcium_dependent = np.array(
+            [rate.get_calcium_dependent() for rate in rate_constants],
+            dtype=np.bool_)
+
     def init(self) -> None:
         """Initializes the model and prepares it before running any simulation.
         """
-        for i, value in enumerate(self.__transition_states.values()):
-            if i == 0:
-                value.update(self.__vesicles)
-            else:
-                value.update(0)
+        self.__index_transitions()
+
+        self._counts[:] = 0
+        self._counts[0] = self.__vesicles
 
         self.set_resting_state(self.get_current_state())
 
@@ -237,8 +316,8 @@ class KineticModel(Synapse):
             Dictionary with the name of all kineuron.TransitionState objects
             and the number of vesicles in each state.
         """
-        for name, state in self.__transition_states.items():
-            state.update(dictionary_state[name])
+        self._counts[:] = [dictionary_state[name]
+                           for name in self.__transition_states]
 
     def set_resting_state(self, dictionary_state: dict) -> None:
         """Sets the model resting state.
@@ -262,16 +341,25 @@ class KineticModel(Synapse):
         """
         return self.__resting_state
 
-    def get_graph(self) -> Digraph:
+    def get_graph(self) -> "graphviz.Digraph":
         """Generates a graph with the model information, i.e., the model name, 
         the names of the kineuron.TransitionState, the kineuron.Transitions 
-        between them and the value of their corresponding rate constants.
+        between them and the value of their corresponding rate constants. The
+        graph is built once and reused until the transitions change.
 
         Return
         ------
         graphviz.Digraph
             Graph with kinetic model.
         """
+        global Digraph
+
+        if self.__graph is not None:
+            return self.__graph
+
+        if Digraph is None:
+            from graphviz import Digraph
+
         f = Digraph('Kinetic Model of Neuromuscular Transmission',
                     filename='graph_model',
                     node_attr={'color': 'lightblue2', 'style': 'filled'}
@@ -289,4 +377,6 @@ class KineticModel(Synapse):
 
             f.edge(origin, destination, label=label)
 
+        self.__graph = f
+
         return f
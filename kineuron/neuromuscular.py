@@ -1,4 +1,6 @@
 class Synapse:
+    __slots__ = ("__name",)
+
     def __init__(self, name: str = None) -> None:
         self.__name: str = name
 
@@ -17,6 +17,7 @@ class RateConstant(Synapse):
         kineuron.RateConstant, its numerical value and whether it is affected 
         by stimulation.
     """
+    __slots__ = ("__rate", "__calcium_dependent", "__info")
 
     def __init__(self, name: str, value: float, calcium_dependent: bool = False):
         """
@@ -33,6 +34,7 @@ class RateConstant(Synapse):
         super().__init__(name)
         self.__rate: float = value
         self.__calcium_dependent: bool = calcium_dependent
+        self.__info: str = None
 
     def get_rate(self) -> float:
         """Returns the numerical value of the rate constant.
@@ -65,14 +67,18 @@ class RateConstant(Synapse):
         str
             General information about the kineuron.RateConstant object.
         """
-        left = 30
-        msg = [
-            "RATE CONSTANT NAME:".ljust(left) + self.get_name(),
-            "RATE CONSTANT VALUE:".ljust(left) + str(self.get_rate()) + " s⁻¹",
-            "CALCIUM-DEPENDENT:".ljust(left) +
-            str(self.get_calcium_dependent())
-        ]
-        return "\n".join(msg)
+        if self.__info is None:
+            left = 30
+            msg = [
+                "RATE CONSTANT NAME:".ljust(left) + self.get_name(),
+                "RATE CONSTANT VALUE:".ljust(left) + str(self.get_rate()) +
+                " s⁻¹",
+                "CALCIUM-DEPENDENT:".ljust(left) +
+                str(self.get_calcium_dependent())
+            ]
+            self.__info = "\n".join(msg)
+
+        return self.__info
 
     def get_info(self) -> None:
         """Returns the general information of the kineuron.RateConstant 
@@ -1,14 +1,38 @@
-import math
-from random import choice, random
+from functools import lru_cache
 from typing import Tuple
 
+import numpy as np
 import pandas as pd
-from tqdm.auto import trange
+from tqdm.auto import tqdm, trange
 
+from . import _kernels
 from .kinetic_model import KineticModel
 from .stimulation import Stimulation
 
 
+@lru_cache(maxsize=8)
+def _time_grid(n_samples: int, time_save: float) -> np.ndarray:
+    """Returns the times at which the state of the model is saved. The grid
+    is shared by the simulations with the same sampling, so it is read-only.
+
+    Parameters
+    ----------
+    n_samples: int
+        Number of saved samples.
+    time_save: float
+        Interval of seconds between samples.
+
+    Return
+    ------
+    numpy.ndarray
+        Times of the samples, rounded to nanoseconds.
+    """
+    time = np.round(np.arange(n_samples) * time_save, 9)
+    time.flags.writeable = False
+
+    return time
+
+
 class Solver:
     """It defines the solver in charge of performing the time evolution of the
     neuromuscular kinetic transmission model, using the Gillespie Stochastic
@@ -29,7 +53,8 @@ class Solver:
         simulation.
     """
 
-    def __init__(self, model: KineticModel, stimulation: Stimulation) -> None:
+    def __init__(self, model: KineticModel, stimulation: Stimulation,
+                 seed: int = None) -> None:
         """Initializes the Solver object, with the previously defined Model
         object and Stimulation object.
 
@@ -42,9 +67,17 @@ class Solver:
         stimulation: kineuron.Stimulation object
             kineuron.Stimulation object containing the stimulation protocol
             information.
+        seed: int, optional
+            Seed of the random number generators. Each repetition draws from
+            its own PCG64 generator, spawned from the seed with
+            numpy.random.SeedSequence. With the same seed, the simulations
+            are reproducible. By default, fresh entropy is taken from the
+            operating system.
         """
         self.__model: KineticModel = model
         self.__stimulation: Stimulation = stimulation
+        self.__seed_sequence = np.random.SeedSequence(seed)
+        self.__rng = np.random.default_rng(self.__seed_sequence)
 
     def __resting_test(self, dataframe: pd.DataFrame, window_width: int,
                        tolerance: float) -> Tuple[dict, bool]:
@@ -101,8 +134,8 @@ class Solver:
             difference = self.__model.get_vesicles() - sum(state.values())
 
             if difference != 0:
-                random_name = choice(list(state.keys()))
-                state[random_name] += difference
+                names = list(state.keys())
+                state[names[self.__rng.integers(len(names))]] += difference
 
             return state, True
 
@@ -136,8 +169,8 @@ class Solver:
                         ascii=True, colour="green", initial=1, leave=False,
                         bar_format="{desc}: {n_fmt}/{total_fmt} |{bar}|"):
 
-            self.__gillespie(repeat=1, time_end=time_end, time_save=0.01,
-                             resting_state_simulation=True)
+            self.__simulate('gillespie', repeat=1, time_end=time_end,
+                            time_save=0.01, resting_state_simulation=True)
 
             state, success = self.__resting_test(
                 self.get_resting_simulation(), window_width, tolerance)
@@ -156,7 +189,7 @@ class Solver:
 
     def run(self, repeat: int = 1, time_end: float = 1.0,
             time_save: float = 0.0001, method: str = 'gillespie',
-            save_transitions: list = []) -> None:
+            save_transitions: list = None, tau: float = None) -> None:
         """Runs the time evolution algorithm of the model. By default, the
         Gillespie stochastic algorithm is invoked.
 
@@ -170,10 +203,18 @@ class Solver:
             Interval of seconds in which the instantaneous state of the model
             will be saved periodically.
         method: str, optional
-            Name of the algorithm to be used. Currently only accepts 'gillespie'.
+            Name of the algorithm to be used. It accepts 'gillespie', the
+            stochastic algorithm that executes one transition per step, and
+            'tau_leap', an approximation that executes many transitions in
+            each step. Since 'tau_leap' evaluates the stimulation in every
+            leap, it follows stimuli shorter than the time between
+            transitions.
         save_transitions: list, optional
             List with the name of the transitions that individual events will
             be included in the final results.
+        tau: float, optional
+            Maximum duration (seconds) of each leap of the 'tau_leap' method.
+            By default, it is equal to 'time_save'.
         """
         message = "The resting state has not been set in the model. Make sure " + \
             "to include the 'Solver.resting_state()' statement."
@@ -181,42 +222,82 @@ class Solver:
 
         print("\nRunning Simulation of Model...")
 
+        if save_transitions is None:
+            save_transitions = []
+
         for element in save_transitions:
             if element not in self.__model.get_transitions().keys():
                 message = f"'{element}' is not a defined name of any " + \
                     "kineuron.Transition object in Model."
                 raise ValueError(message)
 
-        if method == 'gillespie':
-            self.__gillespie(repeat=repeat, time_end=time_end,
-                             time_save=time_save,
-                             save_transitions=save_transitions)
+        if tau is not None and not tau > 0:
+            message = "The duration 'tau' of the leaps must be a positive " + \
+                f"number of seconds, but {tau} was given."
+            raise ValueError(message)
+
+        if method in ('gillespie', 'tau_leap'):
+            self.__simulate(method, repeat=repeat, time_end=time_end,
+                            time_save=time_save,
+                            save_transitions=save_transitions, tau=tau)
         else:
             message = f"Undefined method in '{self.__class__.__name__}' " + \
-                "object. The currently defined method is 'gillespie'."
+                "object. The currently defined methods are 'gillespie' " + \
+                "and 'tau_leap'."
             raise ValueError(message)
 
-    def __save_results(self, results: list,
+    def __save_results(self, results: np.ndarray, columns: list,
+                       time: np.ndarray,
                        resting_state_simulation: bool) -> None:
-        """Saves the temporal evolution of the model in a pandas.DataFrame
-        object.
+        """Saves the temporal evolution of the model. The results of a common
+        run are kept as an array, and the pandas.DataFrame object with all
+        the repetitions is only built when it is requested.
 
         Parameters
         ----------
-        results: list
-            List that temporarily saves the results of the simulation.
+        results: numpy.ndarray
+            Array of shape (repetitions, samples, columns) with the results
+            of the simulation.
+        columns: list
+            Name of the columns of the results.
+        time: numpy.ndarray
+            Times at which the instantaneous state of the model was saved.
         resting_state_simulation: bool
             If the value is 'True', it indicates that the simulation is to
             obtain the resting state of the model. Otherwise, the results are
             from a common run.
         """
         if resting_state_simulation:
-            self.__resting_state_simulation = pd.DataFrame(
-                results).set_index(['run', 'time']).droplevel(level=0)
+            self.__resting_state_simulation = self.__to_dataframe(
+                results, columns, time).droplevel(level=0)
         else:
-            print("Generating results...")
-            self.__results = pd.DataFrame(results).set_index(['run', 'time'])
-            print("Done")
+            self.__results = None
+            self.__raw_results = (results, columns, time)
+
+    def __to_dataframe(self, results: np.ndarray, columns: list,
+                       time: np.ndarray) -> pd.DataFrame:
+        """Auxiliary function that stacks the repetitions of the results in
+        a pandas.DataFrame object indexed by run and time.
+
+        Parameters
+        ----------
+        results: numpy.ndarray
+            Array of shape (repetitions, samples, columns) with the results
+            of the simulation.
+        columns: list
+            Name of the columns of the results.
+        time: numpy.ndarray
+            Times at which the instantaneous state of the model was saved.
+
+        Return
+        ------
+        pandas.DataFrame object.
+        """
+        index = pd.MultiIndex.from_product([range(results.shape[0]), time],
+                                           names=['run', 'time'])
+
+        return pd.DataFrame(results.reshape(-1, len(columns)), index=index,
+                            columns=columns)
 
     def get_results(self, mean: bool = False) -> pd.DataFrame:
         """Returns a pandas.DataFrame object containing the simulation results.
@@ -231,9 +312,19 @@ class Solver:
         ------
         pandas.DataFrame object.
         """
+        results, columns, time = self.__raw_results
+
         if mean:
-            return self.__results.groupby(level=1).mean()
+            # -----------------------------------------------------------------
+            # The average is a single reduction over the repetitions, without
+            # building the pandas.DataFrame with all of them.
+            # -----------------------------------------------------------------
+            return pd.DataFrame(results.mean(axis=0), columns=columns,
+                                index=pd.Index(time, name='time'))
         else:
+            if self.__results is None:
+                self.__results = self.__to_dataframe(results, columns, time)
+
             return self.__results
 
     def get_resting_simulation(self) -> pd.DataFrame:
@@ -246,30 +337,59 @@ class Solver:
         """
         return self.__resting_state_simulation
 
-    def __list2dictzero(self, dummylist: list) -> dict:
-        """Auxiliary function that converts a list of strings into a
-        dictionary with the values initialized to zero.
+    def __build_arrays(self, resting_state_simulation: bool) -> tuple:
+        """Auxiliary function that converts the model into a structure of
+        arrays indexed by integers, which is the layout used by the kernels.
 
         Parameters
         ----------
-        dummylist: list
-            List with strings elements.
+        resting_state_simulation: bool
+            If the value is 'True', no transition is affected by the
+            stimulation.
 
         Return
         ------
-        dict
-            Dictionary with elements of list as keys and all values
-            initialized to zero.
+        list
+            Names of the kineuron.TransitionState objects. Their order
+            defines the index of each state.
+        list
+            Names of the kineuron.Transition objects. Their order defines
+            the index of each transition.
+        numpy.ndarray
+            Index of the source state of each transition.
+        numpy.ndarray
+            Index of the destination state of each transition.
+        numpy.ndarray
+            Value of the rate constant of each transition.
+        numpy.ndarray
+            Flags of the transitions affected by the stimulation.
         """
-        return {element: 0 for element in dummylist}
+        states = list(self.__model.get_transition_states().keys())
+        transitions = list(self.__model.get_transitions().keys())
 
-    def __gillespie(self, repeat: int, time_end: float, time_save: float,
-                    resting_state_simulation: bool = False,
-                    save_transitions: list = []) -> None:
-        """Implementation of Gillespie Stochastic Algorithm (1977).
+        origin = self.__model._origin
+        destination = self.__model._destination
+        rates = self.__model._rates
+        calcium_dependent = self.__model._calcium_dependent
+
+        if resting_state_simulation:
+            calcium_dependent = np.zeros_like(calcium_dependent)
+
+        return states, transitions, origin, destination, rates, \
+            calcium_dependent
+
+    def __simulate(self, method: str, repeat: int, time_end: float,
+                   time_save: float, resting_state_simulation: bool = False,
+                   save_transitions: list = None, tau: float = None) -> None:
+        """Simulates the time evolution of the model with the Gillespie
+        Stochastic Algorithm (1977) or the τ-leaping method. The repetitions
+        are independent, so they are simulated in parallel when Numba is
+        installed.
 
         Parameters
         ----------
+        method: str
+            Name of the algorithm, 'gillespie' or 'tau_leap'.
         repeat: int
             Number of repetitions to be simulated by the model.
         time_end: float
@@ -284,115 +404,94 @@ class Solver:
         save_transitions: list, optional
             List with the name of the transitions that individual events will
             be included in the final results.
+        tau: float, optional
+            Maximum duration of each leap of the 'tau_leap' method.
         """
-        results = []
+        # ---------------------------------------------------------------------
+        # The model is converted into the arrays used by the kernels.
+        # ---------------------------------------------------------------------
+        if save_transitions is None:
+            save_transitions = []
 
-        for i in trange(repeat, desc="Progress: ", ascii=True, colour="green",
-                        disable=resting_state_simulation):
-            # -----------------------------------------------------------------
-            # Initialize the model in its previously found resting state.
-            # -----------------------------------------------------------------
-            self.__model.set_initial_state(self.__model.get_resting_state())
+        states, transitions, origin, destination, rates, calcium_dependent = \
+            self.__build_arrays(resting_state_simulation)
 
-            t = 0.0
-            tsave = 0.0
-            dummy_transitions = self.__list2dictzero(save_transitions)
+        # ---------------------------------------------------------------------
+        # All repetitions start in the previously found resting state.
+        # ---------------------------------------------------------------------
+        resting_state = self.__model.get_resting_state()
+        state = np.tile(np.array([resting_state[name] for name in states],
+                                 dtype=np.int64), (repeat, 1))
+
+        n_samples = int(round(time_end / time_save, 9)) + 1
+        out = np.empty((repeat, n_samples, len(states) + len(transitions)),
+                       dtype=np.int64)
+        # ---------------------------------------------------------------------
+        # Each repetition gets an independent PCG64 generator spawned from the
+        # seed of the Solver.
+        # ---------------------------------------------------------------------
+        generators = [np.random.default_rng(child) for child in
+                      self.__seed_sequence.spawn(repeat)]
+
+        # ---------------------------------------------------------------------
+        # The compiled kernel runs a block of trajectories per thread at a
+        # time. Customized stimulation functions are evaluated in Python,
+        # unless they were tabulated with 'Stimulation.build_lut' or no
+        # transition depends on the stimulus, as in the resting state search.
+        # ---------------------------------------------------------------------
+        stimuli = self.__stimulation._compiled_stimuli
+        python_stimuli = self.__stimulation.stimuli
+
+        if self.__stimulation._lut is not None:
+            python_stimuli = self.__stimulation.stimuli_lut
+
+        if _kernels.NUMBA_AVAILABLE and not calcium_dependent.any():
+            stimuli = _kernels.no_stimuli
+
+        propensities = _kernels.compile_propensities(origin, calcium_dependent)
+
+        if method == 'tau_leap':
+            kernel, kernel_repeat = _kernels.tau_leap.py_func, \
+                _kernels.tau_leap_repeat
+            parameters = (time_save, time_save if tau is None else tau)
+        else:
+            kernel, kernel_repeat = _kernels.gillespie_python, \
+                _kernels.gillespie_repeat
+            parameters = (time_save,)
+
+        with tqdm(total=repeat, desc="Progress: ", ascii=True,
+                  colour="green", disable=resting_state_simulation) as pbar:
+            if stimuli is None:
+                for i in range(repeat):
+                    kernel(state[i], origin, destination, rates,
+                           calcium_dependent, python_stimuli,
+                           propensities.py_func, *parameters, generators[i],
+                           out[i])
+                    pbar.update()
+            else:
+                block = _kernels.get_num_threads()
+
+                for i in range(0, repeat, block):
+                    kernel_repeat(state[i:i + block], origin, destination,
+                                  rates, calcium_dependent, stimuli,
+                                  propensities, *parameters,
+                                  _kernels.List(generators[i:i + block]),
+                                  out[i:i + block])
+                    pbar.update(len(generators[i:i + block]))
+
+        # ---------------------------------------------------------------------
+        # The model is left in the final state of the last repetition.
+        # ---------------------------------------------------------------------
+        self.__model._counts[:] = state[-1]
 
-            # -----------------------------------------------------------------
-            # Starts the Gillespie Stochastic Algorithm loop.
-            # -----------------------------------------------------------------
-            while tsave <= time_end:
-                a = {}
-
-                # --------------------------------------------------------------
-                # Propensity values are computed for each transition.
-                # --------------------------------------------------------------
-                for name, item in self.__model.get_transitions().items():
-                    storage = item.get_origin()
-
-                    dummy_vesicles = self.__model.get_transition_states()[
-                        storage].get_vesicles()
-
-                    dummy_rate = item.get_rate_constant().get_rate()
-
-                    # ---------------------------------------------------------
-                    # The contribution of Stimulation is included.
-                    # ---------------------------------------------------------
-                    if item.get_rate_constant().get_calcium_dependent() and \
-                            not resting_state_simulation:
-
-                        dummy_rate += self.__stimulation.stimuli(t)
-                    # ---------------------------------------------------------
-                    # Propensity value for each individual transition is saved
-                    # ---------------------------------------------------------
-                    a.update({name: dummy_rate * dummy_vesicles})
-
-                # -------------------------------------------------------------
-                # The total propensity of the system is calculated.
-                # -------------------------------------------------------------
-                a0 = sum(a.values())
-
-                # -------------------------------------------------------------
-                # The time in which the next transition will occur is calculated.
-                # -------------------------------------------------------------
-                t = t + math.log(1.0 / random()) / a0
-
-                # -------------------------------------------------------------
-                # The record of the instantaneous state of the model is stored
-                # in a temporary list.
-                # -------------------------------------------------------------
-                while t >= tsave and tsave <= time_end:
-                    dummy = {"run": i, "time": round(tsave, 9)}
-                    dummy.update(self.__model.get_current_state())
-                    dummy.update(dummy_transitions)
-
-                    results.append(dummy)
-
-                    dummy_transitions = self.__list2dictzero(save_transitions)
-                    tsave += time_save
-
-                # -------------------------------------------------------------
-                # The next transition to be executed within the model is chosen
-                # randomly, considering the total propensity of the system.
-                # -------------------------------------------------------------
-                random_a0 = random() * a0
-                accumulative = 0.0
-
-                for key, value in a.items():
-                    transition_name = key
-                    accumulative += value
-
-                    if accumulative > random_a0:
-                        break
-
-                # -------------------------------------------------------------
-                # The parameters defined in the selected kineuron.Transition
-                # object are obtained.
-                # -------------------------------------------------------------
-                transition = self.__model.get_transitions()[transition_name]
-                origin = transition.get_origin()
-                destination = transition.get_destination()
-
-                # -------------------------------------------------------------
-                # The transition is executed by updating the number of vesicles
-                # in the kineuron.TransitionState objects involved.
-                # -------------------------------------------------------------
-                self.__model.get_transition_states()[origin].pop_vesicle()
-                self.__model.get_transition_states()[destination].add_vesicle()
-
-                # -------------------------------------------------------------
-                # The individual transition event is recorded for attachment to
-                # the results.
-                # -------------------------------------------------------------
-                if transition_name in save_transitions:
-                    dummy_transitions[transition_name] += 1
-
-                # -------------------------------------------------------------
-                # The previous steps are repeated until the end time of the
-                # simulation is reached.
-                # -------------------------------------------------------------
         # ---------------------------------------------------------------------
         # The results of all iterations of the algorithm are saved.
         # ---------------------------------------------------------------------
-        self.__save_results(results, resting_state_simulation)
-        del results
+        columns = list(range(len(states))) + \
+            [len(states) + transitions.index(name)
+             for name in save_transitions]
+        time = _time_grid(n_samples, time_save)
+
+        self.__save_results(out[:, :, columns], states + save_transitions,
+                            time, resting_state_simulation)
+        del out
@@ -1,20 +1,47 @@
 import math
+from abc import ABC, abstractmethod
+from bisect import bisect_right
 from types import FunctionType
+from weakref import WeakKeyDictionary
 
-import matplotlib.pyplot as plt
 import numpy as np
 
+from ._kernels import (NUMBA_AVAILABLE, compile_exponential_decay,
+                       compile_interpolation, exponential_decay_array,
+                       interpolate)
 from .neuromuscular import Synapse
 
+# -----------------------------------------------------------------------------
+# matplotlib.pyplot is only imported the first time a protocol is plotted, so
+# simulations do not pay for loading it.
+# -----------------------------------------------------------------------------
+plt = None
 
-class Stimulation(Synapse):
+# -----------------------------------------------------------------------------
+# Compiled versions of the protocols used by the kineuron.Solver kernels. They
+# are C callbacks that cannot be pickled or copied, so they are kept outside
+# the kineuron.Stimulation objects.
+# -----------------------------------------------------------------------------
+_COMPILED_STIMULI = WeakKeyDictionary()
+
+
+class Stimulation(Synapse, ABC):
     """The calcium-dependent stimulation to be used in the simulation of the 
-    kinetic model is defined.
+    kinetic model is defined. Depending on 'type_stimulus', an instance of
+    kineuron.ExpDecayStimulation or kineuron.CustomStimulation is created.
 
     Methods
     -------
     stimuli
         Returns the value of the stimulation function at time t.
+    stimuli_array
+        Returns the values of the stimulation function over an array of
+        times.
+    build_lut
+        Tabulates the stimulation function on a regular time grid, which is
+        then interpolated by the kineuron.Solver.
+    stimuli_lut
+        Returns the value of the tabulated stimulation function at time t.
     plot
         Plots the stimulation profile over a time range defined by 
         a numpy.array.
@@ -25,72 +52,69 @@ class Stimulation(Synapse):
         each stimulus, etc.
     """
 
-    def __init__(self, name: str = "Stimulation Protocol",
-                 type_stimulus: str = 'exponential_decay',
-                 time_start_stimulation: float = None,
-                 conditional_stimuli: int = None, period: float = None,
-                 tau_stimulus: float = None, intensity_stimulus: float = None,
-                 time_wait_test: float = None, func: FunctionType = None) -> None:
+    def __new__(cls, name: str = "Stimulation Protocol",
+                type_stimulus: str = 'exponential_decay', *args, **kwargs):
+        """Chooses the class of the stimulation protocol from the value of
+        'type_stimulus'. The parameters are described in the subclasses.
+        """
+        if cls is Stimulation:
+            classes = {'exponential_decay': ExpDecayStimulation,
+                       'customized': CustomStimulation}
+
+            if type_stimulus not in classes:
+                message = f"The '{cls.__name__}' object does not accept" + \
+                    f" '{type_stimulus}' as a valid value of 'type_stimulus'."
+                raise ValueError(message)
+
+            cls = classes[type_stimulus]
+
+        return super().__new__(cls)
+
+    def __init__(self, name: str, type_stimulus: str) -> None:
         """
         Parameters
         ----------
-        name : str, optional
+        name : str
             Stimulation protocol name.
-        type_stimulus : str, opcional
-            Profile of each individual stimulus. By default, the argument 
-            value is 'exponential_delay' which corresponds to a stimulus 
-            with an instantaneous rise followed by an exponential decay.
-            If the argument value is 'customized', you must provide a 
-            function f(t) in the 'func' argument that returns the customized 
-            stimulation profile.
-        time_start_stimulation : float
-            Time at which the stimulation starts within the time evolution of 
-            the model simulation.
-        conditional_stimuli : int
-            Number of conditional stimuli.
-        period : float
-            Waiting time between each conditional stimulus. In case the 
-            number of conditional number of conditional stimuli is one, the 
-            period is omitted.
-        tau_stimulus: float
-            Time constant of the duration of each individual stimulus.
-        intensity_stimulus : float
-            Intensity each stimulus defined in arbitrary units.
-        time_wait_test : float
-            Waiting time interval between the last conditional stimulus and 
-            the test stimulus.
-        func : FunctionType, optional
-            Function f(t) that you must provide when the argument 
-            'type_stimulation' is 'customized'. 
+        type_stimulus : str
+            Profile of each individual stimulus.
         """
-
         super().__init__(name)
 
         self.__type_stimulus: str = type_stimulus
+        self.__info: str = None
+        self._lut: np.ndarray = None
+
+    @property
+    def _compiled_stimuli(self):
+        """Compiled function f(t) of the protocol that is passed to the
+        kineuron.Solver kernels. It is built the first time it is needed, and
+        it is None when Numba is not installed or the protocol can only be
+        evaluated in Python.
+        """
+        if not NUMBA_AVAILABLE:
+            return None
 
-        if type_stimulus == "customized":
-            message = f"The 'type_stimulus' argument is 'customized'. " + \
-                f"Please provide a {FunctionType} object in 'func' argument."
-            assert isinstance(func, FunctionType), message
-
-            self.__customized_func: FunctionType = func
+        if self not in _COMPILED_STIMULI:
+            if self._lut is not None:
+                _COMPILED_STIMULI[self] = compile_interpolation(
+                    self._lut, self.__inv_dt)
+            else:
+                _COMPILED_STIMULI[self] = self._compile()
 
-        else:
-            message = f"The '{self.__class__.__name__}' object does not accept" + \
-                f" '{type_stimulus}' as a valid value of 'type_stimulus'."
+        return _COMPILED_STIMULI[self]
 
-            if type_stimulus != 'exponential_decay':
-                raise ValueError(message)
+    def _compile(self):
+        """Returns the compiled function f(t) of the protocol, if the type of
+        stimulation defines one.
+        """
+        return None
 
-            epsilon = 0.005
-            self.__time_start_stimulation: float = time_start_stimulation
-            self.__conditional_stimuli: int = conditional_stimuli
-            self.__period: float = period
-            self.__tau_stimulus: float = tau_stimulus
-            self.__time_wait_test: float = time_wait_test
-            self.__intensity_stimulus: float = intensity_stimulus
-            self.__time_end_stimulation: float = time_start_stimulation + \
-                (conditional_stimuli - 1) * period + epsilon
+    def _overview(self) -> list:
+        """Returns the lines of the general information that are specific to
+        the type of stimulation.
+        """
+        return []
 
     def __str__(self) -> str:
         """Builds a string with the general information of the stimulation 
@@ -105,35 +129,19 @@ class Stimulation(Synapse):
         str
             General information defined within the Stimulation object.
         """
-        width = 65
-        left = 40
+        if self.__info is None:
+            width = 65
+            left = 40
+
+            msg = ["  STIMULATION PROTOCOL OVERVIEW  ".center(width, "="),
+                   " - Name:".ljust(left) + self.get_name(),
+                   " - Type of stimulus:".ljust(left) +
+                   self.__type_stimulus.capitalize().replace("_", " ")]
+
+            msg = msg + self._overview() + ["".center(width, "=")]
+            self.__info = "\n".join(msg)
 
-        msg = ["  STIMULATION PROTOCOL OVERVIEW  ".center(width, "="),
-               " - Name:".ljust(left) + self.get_name(),
-               " - Type of stimulus:".ljust(left) +
-               self.__type_stimulus.capitalize().replace("_", " ")]
-
-        if self.__type_stimulus == 'customized':
-            aux = [" - Function name:".ljust(left) +
-                   self.__customized_func.__name__]
-        else:
-            aux = [" - Conditional stimuli:".ljust(left) +
-                   str(self.__conditional_stimuli),
-                   " - Start time:".ljust(left) +
-                   str(self.__time_start_stimulation) + " s",
-                   " - Conditional stimuli period:".ljust(left) +
-                   str(self.__period) + " s",
-                   " - Time constant of the stimuli:".ljust(left) +
-                   str(self.__tau_stimulus) + " s",
-                   " - Waiting time between last",
-                   "   conditional and test stimuli:".ljust(left) +
-                   str(self.__time_wait_test) + " s",
-                   " - Stimulus intensity:".ljust(left) +
-                   str(self.__intensity_stimulus)]
-
-        msg = msg + aux + ["".center(width, "=")]
-
-        return "\n".join(msg)
+        return self.__info
 
     def get_info(self) -> None:
         """Returns the general information of the stimulation protocol, i.e. 
@@ -149,9 +157,10 @@ class Stimulation(Synapse):
         """
         print(self.__str__())
 
+    @abstractmethod
     def stimuli(self, t: float) -> float:
-        '''Calls the specific stimulation function depending on the value 
-        of type_stimulus.
+        '''Returns the value of the stimulation function at time t. It is
+        defined by each type of stimulation.
 
         Parameters
         ----------
@@ -163,10 +172,72 @@ class Stimulation(Synapse):
         float
             The stimulus value at time t.
         '''
-        if self.__type_stimulus == 'exponential_decay':
-            return self.__exponential_decay(t)
-        else:
-            return self.__customized_func(t)
+
+    def stimuli_array(self, t: np.ndarray) -> np.ndarray:
+        '''Evaluates the stimulation function over an array of times.
+        Functions that accept arrays are computed as a whole array operation.
+        Otherwise, they are evaluated element by element.
+
+        Parameters
+        ----------
+        t : numpy.array
+            Array of values of the time variable.
+
+        Return
+        ------
+        numpy.array
+            The stimulus values at each time of t.
+        '''
+        t = np.asarray(t, dtype=np.float64)
+
+        try:
+            values = np.asarray(self.stimuli(t), dtype=np.float64)
+
+            if values.shape == t.shape:
+                return values
+
+        except (TypeError, ValueError):
+            pass
+
+        return np.vectorize(self.stimuli, otypes=[float])(t)
+
+    def build_lut(self, dt: float, t_max: float) -> None:
+        """Tabulates the stimulation function every 'dt' seconds up to
+        't_max'. From then on, the kineuron.Solver linearly interpolates
+        the table instead of evaluating the function, which is faster and
+        allows customized functions to run in the compiled kernels. The
+        interpolation error grows with dt / tau_stimulus, and the rise of each
+        stimulus is smoothed over one step, so 'dt' must be much shorter than
+        the duration of the stimuli.
+
+        Parameters
+        ----------
+        dt : float
+            Step of the time grid, in seconds.
+        t_max : float
+            Last time of the grid, in seconds. Beyond it, the last value of
+            the table is used.
+        """
+        self._lut = self.stimuli_array(
+            np.arange(int(np.ceil(t_max / dt)) + 1) * dt)
+        self.__inv_dt: float = 1.0 / dt
+        _COMPILED_STIMULI.pop(self, None)
+
+    def stimuli_lut(self, t: float) -> float:
+        """Returns the value at time t of the stimulation function tabulated
+        by the 'build_lut' method.
+
+        Parameters
+        ----------
+        t : float
+            Time variable within the model simulation.
+
+        Return
+        ------
+        float
+            The interpolated stimulus value at time t.
+        """
+        return interpolate(t, self._lut, self.__inv_dt)
 
     def plot(self, t: float, xlabel: str = "Time",
              ylabel: str = "Intensity", **kwargs) -> None:
@@ -181,14 +252,138 @@ class Stimulation(Synapse):
         ylabel : str, optional
             Name of the y-axis label of the graph. Default 'Intensity'.
         """
-        f = np.vectorize(self.stimuli)
-        plt.plot(t, f(t), **kwargs)
+        global plt
+
+        if plt is None:
+            import matplotlib.pyplot as plt
+
+        plt.plot(t, self.stimuli_array(t), **kwargs)
         plt.title(self.get_name())
         plt.xlabel(xlabel)
         plt.ylabel(ylabel)
         plt.show()
 
-    def __exponential_decay(self, t: float) -> float:
+
+class ExpDecayStimulation(Stimulation):
+    """Stimulation protocol with a train of conditional stimuli followed by a
+    test stimulus. Each stimulus has an instantaneous rise followed by an
+    exponential decay.
+    """
+
+    def __init__(self, name: str = "Stimulation Protocol",
+                 type_stimulus: str = 'exponential_decay',
+                 time_start_stimulation: float = None,
+                 conditional_stimuli: int = None, period: float = None,
+                 tau_stimulus: float = None, intensity_stimulus: float = None,
+                 time_wait_test: float = None, func: FunctionType = None) -> None:
+        """
+        Parameters
+        ----------
+        name : str, optional
+            Stimulation protocol name.
+        type_stimulus : str, opcional
+            Accepted for compatibility with kineuron.Stimulation. It must be
+            'exponential_decay'.
+        time_start_stimulation : float
+            Time at which the stimulation starts within the time evolution of 
+            the model simulation.
+        conditional_stimuli : int
+            Number of conditional stimuli.
+        period : float
+            Waiting time between each conditional stimulus. In case the 
+            number of conditional number of conditional stimuli is one, the 
+            period is omitted.
+        tau_stimulus: float
+            Time constant of the duration of each individual stimulus.
+        intensity_stimulus : float
+            Intensity each stimulus defined in arbitrary units.
+        time_wait_test : float
+            Waiting time interval between the last conditional stimulus and 
+            the test stimulus.
+        func : FunctionType, optional
+            Not used by this type of stimulation, so it must be None.
+        """
+        if type_stimulus != 'exponential_decay':
+            message = f"The '{self.__class__.__name__}' object only " + \
+                "accepts 'exponential_decay' as 'type_stimulus'."
+            raise ValueError(message)
+
+        if func is not None:
+            message = "The 'exponential_decay' type of stimulus does not " + \
+                "use the 'func' argument. Customized functions require " + \
+                "'type_stimulus' to be 'customized'."
+            raise ValueError(message)
+
+        super().__init__(name, 'exponential_decay')
+
+        arguments = {"time_start_stimulation": time_start_stimulation,
+                     "conditional_stimuli": conditional_stimuli,
+                     "tau_stimulus": tau_stimulus,
+                     "intensity_stimulus": intensity_stimulus,
+                     "time_wait_test": time_wait_test}
+
+        if conditional_stimuli is None or conditional_stimuli > 1:
+            arguments["period"] = period
+
+        missing = [key for key, value in arguments.items() if value is None]
+
+        if missing:
+            message = "The 'exponential_decay' type of stimulus requires " + \
+                "the arguments: " + ", ".join(f"'{key}'" for key in missing)
+            raise ValueError(message)
+
+        self.__time_start_stimulation: float = time_start_stimulation
+        self.__conditional_stimuli: int = conditional_stimuli
+        self.__period: float = period
+        self.__tau_stimulus: float = tau_stimulus
+        self.__time_wait_test: float = time_wait_test
+        self.__intensity_stimulus: float = intensity_stimulus
+
+        # ---------------------------------------------------------------------
+        # The onsets of the conditional stimuli and of the test stimulus are
+        # computed once. The protocol is evaluated from the last onset before
+        # each time.
+        # ---------------------------------------------------------------------
+        conditional = [time_start_stimulation] + \
+            [time_start_stimulation + k * period
+             for k in range(1, conditional_stimuli)]
+        delta_last = 0.0 if conditional_stimuli == 1 else \
+            (conditional_stimuli - 1) * period
+
+        self.__onsets: tuple = tuple(
+            conditional +
+            [time_start_stimulation + delta_last + time_wait_test])
+        self.__inv_tau: float = 1.0 / tau_stimulus
+        self.__parameters: tuple = (np.array(self.__onsets), self.__inv_tau,
+                                    intensity_stimulus)
+
+    def _compile(self):
+        """Returns the compiled function f(t) of the exponential decay
+        protocol.
+        """
+        return compile_exponential_decay(*self.__parameters)
+
+    def _overview(self) -> list:
+        """Returns the lines of the general information of the exponential
+        decay protocol.
+        """
+        left = 40
+
+        return [" - Conditional stimuli:".ljust(left) +
+                str(self.__conditional_stimuli),
+                " - Start time:".ljust(left) +
+                str(self.__time_start_stimulation) + " s",
+                " - Conditional stimuli period:".ljust(left) +
+                str(self.__period) + " s",
+                " - Time constant of the stimuli:".ljust(left) +
+                str(self.__tau_stimulus) + " s",
+                " - Waiting time between last",
+                "   conditional and test stimuli:".ljust(left) +
+                str(self.__time_wait_test) + " s",
+                " - Stimulus intensity:".ljust(left) +
+                str(self.__intensity_stimulus)]
+
+    def stimuli(self, t: float) -> float:
         '''Function that models the stimulation protocol with exponential 
         stimulus decay profile.
 
@@ -202,23 +397,89 @@ class Stimulation(Synapse):
         float
             The stimulus value at time t.
         '''
-        delta_time = t - self.__time_start_stimulation
+        onsets = self.__onsets
+        intensity = self.__intensity_stimulus
+        inv_tau = self.__inv_tau
 
-        time_test = self.__time_start_stimulation + \
-            (self.__conditional_stimuli - 1) * self.__period + \
-            self.__time_wait_test
+        i = bisect_right(onsets, t)
 
-        if t >= self.__time_start_stimulation and t < self.__time_end_stimulation:
-            f = math.exp(-(delta_time % self.__period) / self.__tau_stimulus)
+        if i == 0:
+            return 0.0
 
-        elif t >= self.__time_end_stimulation and t < time_test:
-            f = math.exp(-(delta_time - (self.__conditional_stimuli - 1)
-                         * self.__period) / self.__tau_stimulus)
+        return intensity * math.exp(-(t - onsets[i - 1]) * inv_tau)
 
-        elif t >= time_test:
-            f = math.exp(-(t - time_test) / self.__tau_stimulus)
+    def stimuli_array(self, t: np.ndarray) -> np.ndarray:
+        '''Evaluates the exponential decay protocol over an array of times
+        as a whole array operation.
 
-        else:
-            f = 0.0
+        Parameters
+        ----------
+        t : numpy.array
+            Array of values of the time variable.
 
-        return self.__intensity_stimulus * f
+        Return
+        ------
+        numpy.array
+            The stimulus values at each time of t.
+        '''
+        return exponential_decay_array(np.asarray(t, dtype=np.float64),
+                                       *self.__parameters)
+
+
+class CustomStimulation(Stimulation):
+    """Stimulation protocol defined by a function f(t) provided by the user.
+    """
+
+    def __init__(self, name: str = "Stimulation Protocol",
+                 type_stimulus: str = 'customized',
+                 time_start_stimulation: float = None,
+                 conditional_stimuli: int = None, period: float = None,
+                 tau_stimulus: float = None, intensity_stimulus: float = None,
+                 time_wait_test: float = None, func: FunctionType = None) -> None:
+        """
+        Parameters
+        ----------
+        name : str, optional
+            Stimulation protocol name.
+        type_stimulus : str, opcional
+            Accepted for compatibility with kineuron.Stimulation. It must be
+            'customized'.
+        func : FunctionType
+            Function f(t) that returns the customized stimulation profile.
+
+        The rest of the parameters are not used by this type of stimulation.
+        """
+        if type_stimulus != 'customized':
+            message = f"The '{self.__class__.__name__}' object only " + \
+                "accepts 'customized' as 'type_stimulus'."
+            raise ValueError(message)
+
+        super().__init__(name, 'customized')
+
+        message = f"The 'type_stimulus' argument is 'customized'. " + \
+            f"Please provide a {FunctionType} object in 'func' argument."
+        assert isinstance(func, FunctionType), message
+
+        self.__customized_func: FunctionType = func
+
+    def _overview(self) -> list:
+        """Returns the lines of the general information of the customized
+        protocol.
+        """
+        return [" - Function name:".ljust(40) +
+                self.__customized_func.__name__]
+
+    def stimuli(self, t: float) -> float:
+        '''Returns the value of the customized function at time t.
+
+        Parameters
+        ----------
+        t : float
+            Time variable within the model simulation.
+
+        Return
+        ------
+        float
+            The stimulus value at time t.
+        '''
+        return self.__customized_func(t)
@@ -25,6 +25,7 @@ class Transition(Synapse):
         calcium-dependent, as well as the source and destination 
         kineuron.TransitionState involved in this kineuron.Transition.
     """
+    __slots__ = ("__rate", "__origin", "__destination", "__info")
 
     def __init__(self, name: str, rate_constant: RateConstant,
                  origin: str, destination: str) -> None:
@@ -47,6 +48,7 @@ class Transition(Synapse):
         self.__rate: RateConstant = rate_constant
         self.__origin: str = origin
         self.__destination: str = destination
+        self.__info: str = None
 
     def get_rate_constant(self) -> RateConstant:
         """Returns the kineuron.RateConstant object associated with this 
@@ -94,16 +96,19 @@ class Transition(Synapse):
             whether it is calcium-dependent. It also includes the source and 
             destination kineuron.TransitionState objects information.
         """
-        width = 50
-        left = 30
-        msg = [
-            "".center(width, "-"),
-            "NAME TRANSITION:".ljust(left) + self.get_name(),
-            str(self.__rate),
-            "ORIGIN:".ljust(left) + self.__origin,
-            "DESTINATION:".ljust(left) + self.__destination
-        ]
-        return "\n".join(msg)
+        if self.__info is None:
+            width = 50
+            left = 30
+            msg = [
+                "".center(width, "-"),
+                "NAME TRANSITION:".ljust(left) + self.get_name(),
+                str(self.__rate),
+                "ORIGIN:".ljust(left) + self.__origin,
+                "DESTINATION:".ljust(left) + self.__destination
+            ]
+            self.__info = "\n".join(msg)
+
+        return self.__info
 
     def get_info(self) -> None:
         """Returns the general information of the kineuron.Transition object.
@@ -1,3 +1,5 @@
+import numpy as np
+
 from .neuromuscular import Synapse
 
 
@@ -21,6 +23,7 @@ class TransitionState(Synapse):
         Returns the general information of the kineuron.TransitionState object, 
         such as its name and the number of current vesicles.
     """
+    __slots__ = ("_counts", "_index", "__prefix")
 
     def __init__(self, name: str) -> None:
         """
@@ -30,7 +33,29 @@ class TransitionState(Synapse):
             kineuron.TransitionState object name.
         """
         super().__init__(name)
-        self.__vesicles: int = 0
+
+        # ---------------------------------------------------------------------
+        # The number of vesicles is stored in an element of an int64 array.
+        # When the object is added to a kineuron.KineticModel, the array is
+        # shared by all the states of the model.
+        # ---------------------------------------------------------------------
+        self._counts: np.ndarray = np.zeros(1, dtype=np.int64)
+        self._index: int = 0
+        self.__prefix: str = f"- {name}:".ljust(30)
+
+    def _bind(self, counts: np.ndarray, index: int) -> None:
+        """Moves the number of vesicles of the kineuron.TransitionState object
+        to an element of the array of counts of a kineuron.KineticModel.
+
+        Parameters
+        ----------
+        counts : numpy.ndarray
+            Array with the number of vesicles of each transition state.
+        index : int
+            Index of the kineuron.TransitionState object within the array.
+        """
+        counts[index] = self._counts[self._index]
+        self._counts, self._index = counts, index
 
     def get_vesicles(self) -> int:
         """ Returns the number of current vesicles that are in the 
@@ -41,7 +66,7 @@ class TransitionState(Synapse):
         int
             Number of vesicles in the kineuron.TransitionState object.
         """
-        return self.__vesicles
+        return int(self._counts[self._index])
 
     def update(self, vesicles: int) -> None:
         """Updates the total number of vesicles that are in the
@@ -52,7 +77,7 @@ class TransitionState(Synapse):
         vesicles : int
             Total number of vesicles in the kineuron.TransitionState object.
         """
-        self.__vesicles = vesicles
+        self._counts[self._index] = vesicles
 
     def add_vesicle(self, vesicles: int = 1) -> None:
         """Add a vesicle to the current kineuron.TransitionState vesicle 
@@ -63,7 +88,7 @@ class TransitionState(Synapse):
         vesicles : int, optional
             Number of vesicles to be added.
         """
-        self.__vesicles += vesicles
+        self._counts[self._index] += vesicles
 
     def pop_vesicle(self, vesicles: int = 1) -> None:
         """Remove a vesicle from the kineuron.TransitionState vesicle 
@@ -74,7 +99,7 @@ class TransitionState(Synapse):
         vesicles : int, optional
             Number of vesicles to be removed.
         """
-        self.__vesicles -= vesicles
+        self._counts[self._index] -= vesicles
 
     def __str__(self) -> str:
         """Builds a string with the general information of the 
@@ -86,7 +111,7 @@ class TransitionState(Synapse):
             Name of the kineuron.TransitionState object and its number of 
             vesicles.
         """
-        return f"- {self.get_name()}:".ljust(30) + str(self.get_vesicles())
+        return self.__prefix + str(self.get_vesicles())
 
     def get_info(self) -> None:
         """Returns the general information of the kineuron.TransitionState 
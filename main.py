@@ -3,19 +3,27 @@ from kineuron import (KineticModel, RateConstant, Solver, Stimulation,
 
 model = KineticModel(name='my-model', vesicles=100)
 
-docked = TransitionState(name='Docked')
-fusion = TransitionState(name='Fusion')
-
-alpha = RateConstant(name="α", value=0.3, calcium_dependent=True)
-beta = RateConstant(name="β", value=15)
-
-tr1 = Transition(name='Transition 1', rate_constant=alpha,
-                 origin="Docked", destination="Fusion")
-tr2 = Transition(name='Transition 2', rate_constant=beta,
-                 origin="Fusion", destination="Docked")
-
-model.add_transition_states([docked, fusion])
-model.add_transitions([tr1, tr2])
+# The model is described by tables: one row per rate constant (name, value,
+# calcium-dependent) and one row per transition (name, rate constant, origin,
+# destination).
+states = ["Docked", "Fusion"]
+
+rate_constants_table = [("α", 0.3, True),
+                        ("β", 15, False)]
+
+transitions_table = [("Transition 1", "α", "Docked", "Fusion"),
+                     ("Transition 2", "β", "Fusion", "Docked")]
+
+rate_constants = {name: RateConstant(name=name, value=value,
+                                     calcium_dependent=calcium_dependent)
+                  for name, value, calcium_dependent in rate_constants_table}
+
+model.add_transition_states([TransitionState(name=name) for name in states])
+model.add_transitions([Transition(name=name,
+                                  rate_constant=rate_constants[rate],
+                                  origin=origin, destination=destination)
+                       for name, rate, origin, destination
+                       in transitions_table])
 
 model.init()
 model.get_info()
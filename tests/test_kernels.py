@@ -0,0 +1,84 @@
+import unittest
+
+import numpy as np
+from kineuron import _kernels
+
+
+class TestKernels(unittest.TestCase):
+    def setUp(self) -> None:
+        self.parameters = (np.array([0.1, 0.2, 0.3, 0.45]), 20.0, 100.0)
+
+    def test_exponential_decay_array(self) -> None:
+        t = np.linspace(0.0, 1.0, 1001)
+        desired = np.array([_kernels.exponential_decay(x, *self.parameters)
+                            for x in t])
+        actual = _kernels.exponential_decay_array(t, *self.parameters)
+
+        np.testing.assert_allclose(actual, desired, rtol=1e-12)
+
+    def test_propensities_loop(self) -> None:
+        origin = np.array([0, 1, 1, 2, 0], dtype=np.int64)
+        calcium_dependent = np.array([True, False, True, False, False])
+        rates = np.array([0.3, 15.0, 2.5, 7.0, 1.0])
+        state = np.array([40, 25, 35], dtype=np.int64)
+        propensities = _kernels.compile_propensities(origin,
+                                                     calcium_dependent)
+
+        desired, actual = np.zeros(5), np.zeros(5)
+        total = propensities(state, rates, 12.5, desired)
+
+        self.assertEqual(_kernels.propensities_loop(
+            state, origin, rates, calcium_dependent, 12.5, actual), total)
+        np.testing.assert_array_equal(actual, desired)
+
+    def test_propensities_not_unrolled(self) -> None:
+        origin = np.zeros(5000, dtype=np.int64)
+        calcium_dependent = np.zeros(5000, dtype=np.bool_)
+
+        self.assertIs(_kernels.compile_propensities(origin,
+                                                    calcium_dependent),
+                      _kernels.looped_propensities)
+
+    def test_gillespie_python(self) -> None:
+        stimuli = _kernels.compile_exponential_decay(*self.parameters)
+
+        # ---------------------------------------------------------------------
+        # A small ring, a ring with enough transitions to use the Fenwick
+        # tree and a chain that drains into an absorbing state, with some
+        # calcium-dependent transitions.
+        # ---------------------------------------------------------------------
+        models = []
+        for n_states in (3, 12):
+            states = np.arange(n_states)
+            models.append((np.concatenate([states, (states + 1) % n_states]),
+                           np.concatenate([(states + 1) % n_states, states]),
+                           0.001))
+
+        states = np.arange(20)
+        models.append((states, states + 1, 0.1))
+
+        for origin, destination, time_save in models:
+            n_states = destination.max() + 1
+            n_transitions = origin.shape[0]
+            rates = np.linspace(1.0, 8.0, n_transitions)
+            calcium_dependent = np.arange(n_transitions) % 6 < 2
+            propensities = _kernels.compile_propensities(origin,
+                                                         calcium_dependent)
+
+            results = []
+            for kernel, function in ((_kernels.gillespie, propensities),
+                                     (_kernels.gillespie_python,
+                                      propensities.py_func)):
+                state = np.full(n_states, 40, dtype=np.int64)
+                out = np.empty((501, n_states + n_transitions),
+                               dtype=np.int64)
+                kernel(state, origin, destination, rates, calcium_dependent,
+                       stimuli, function, time_save,
+                       np.random.default_rng(17), out)
+                results.append(out)
+
+            np.testing.assert_array_equal(results[0], results[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -70,12 +70,77 @@ class TestKineticModel(unittest.TestCase):
         self.assertDictEqual(
             self.model.get_current_state(), dict_current_state)
 
+    def test_shared_counts(self) -> None:
+        docked, fusion = self.list_transition_states
+        docked.pop_vesicle(3)
+        fusion.add_vesicle(3)
+
+        self.assertEqual(self.model._counts.tolist(), [97, 3])
+        self.assertDictEqual(self.model.get_current_state(),
+                             {"Docked": 97, "Fusion": 3})
+
+    def test_transition_indices(self) -> None:
+        self.assertEqual(self.model._origin.tolist(), [0, 1])
+        self.assertEqual(self.model._destination.tolist(), [1, 0])
+
+    def test_rate_arrays(self) -> None:
+        self.assertEqual(self.model._rates.tolist(), [0.3, 15.0])
+        self.assertEqual(self.model._calcium_dependent.tolist(),
+                         [True, False])
+
+    def test_undefined_transition_state(self) -> None:
+        gamma = RateConstant(name="γ", value=1.0)
+        transitions = self.list_transitions + [
+            Transition(name='Transition 3', rate_constant=gamma,
+                       origin="Docked", destination="Primed")]
+
+        model2 = KineticModel(name='my-model-2', vesicles=100)
+        model2.add_transition_states(self.list_transition_states)
+        model2.add_transitions(transitions)
+
+        with self.assertRaises(ValueError):
+            model2.init()
+
+        with self.assertRaises(ValueError):
+            self.model.add_transitions(transitions)
+
+    def test_add_transitions_after_init(self) -> None:
+        gamma = RateConstant(name="γ", value=1.0)
+        self.model.add_transitions(self.list_transitions + [
+            Transition(name='Transition 3', rate_constant=gamma,
+                       origin="Docked", destination="Fusion")])
+
+        self.assertTrue(self.model._init_flag)
+        self.assertEqual(self.model._origin.tolist(), [0, 1, 0])
+        self.assertEqual(self.model._destination.tolist(), [1, 0, 1])
+        self.assertEqual(self.model._rates.tolist(), [0.3, 15.0, 1.0])
+        self.assertEqual(self.model._calcium_dependent.tolist(),
+                         [True, False, False])
+
+    def test_add_transition_states_after_init(self) -> None:
+        self.model.add_transition_states(self.list_transition_states)
+
+        self.assertFalse(self.model._init_flag)
+        self.assertFalse(self.model._init_resting_state)
+
     @patch("kineuron.kinetic_model.Digraph")
     def test_get_graph(self, mock_digraph) -> None:
         self.model.get_graph()
 
         mock_digraph.assert_called()
 
+    @patch("kineuron.kinetic_model.Digraph")
+    def test_get_graph_cached(self, mock_digraph) -> None:
+        graph = self.model.get_graph()
+
+        self.assertIs(self.model.get_graph(), graph)
+        mock_digraph.assert_called_once()
+
+        self.model.add_transitions(self.list_transitions)
+        self.model.get_graph()
+
+        self.assertEqual(mock_digraph.call_count, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,7 @@
 import os
-import random
 import unittest
 
+import numpy as np
 import pandas as pd
 from pandas.testing import assert_frame_equal
 
@@ -57,25 +57,49 @@ class TestSolver(unittest.TestCase):
 
         self.assertRaises(AssertionError, experiment.resting_state)
 
+    def test_add_transitions_after_init(self) -> None:
+        gamma = RateConstant(name="γ", value=1.0)
+        self.model.add_transitions(self.list_transitions + [
+            Transition(name='Transition 3', rate_constant=gamma,
+                       origin="Docked", destination="Fusion")])
+
+        experiment = Solver(model=self.model, stimulation=self.protocol,
+                            seed=21)
+        experiment.resting_state()
+        experiment.run(repeat=2, time_end=0.5, time_save=0.001,
+                       save_transitions=["Transition 3"])
+        results = experiment.get_results()
+
+        self.assertTrue((results[["Docked", "Fusion"]].sum(axis=1)
+                         == 100).all())
+        self.assertGreater(results["Transition 3"].sum(), 0)
+
+    def test_add_transition_states_after_init(self) -> None:
+        self.model.add_transition_states(self.list_transition_states)
+
+        self.assertRaises(AssertionError, self.experiment.resting_state)
+
     def test_not_resting_state(self) -> None:
         self.assertRaises(AssertionError, self.experiment.run)
 
     def test_resting_state(self) -> None:
-        random.seed(135)
-        self.experiment.resting_state()
+        experiment = Solver(model=self.model, stimulation=self.protocol,
+                            seed=135)
+        experiment.resting_state()
 
         self.assertTrue(self.model._init_resting_state)
 
         self.assertIsInstance(
-            self.experiment.get_resting_simulation(), pd.DataFrame)
+            experiment.get_resting_simulation(), pd.DataFrame)
 
         self.assertDictEqual(
             self.model.get_resting_state(), {'Docked': 98, 'Fusion': 2})
 
     def test_reset_init(self) -> None:
-        random.seed(36)
+        experiment = Solver(model=self.model, stimulation=self.protocol,
+                            seed=36)
         for _ in range(3):
-            self.experiment.resting_state()
+            experiment.resting_state()
 
         vesicles = sum(self.model.get_current_state().values())
 
@@ -86,21 +110,33 @@ class TestSolver(unittest.TestCase):
         self.assertRaises(ValueError, self.experiment.run, method="custom")
 
     def test_run(self) -> None:
-        random.seed(46)
+        experiment = Solver(model=self.model, stimulation=self.protocol,
+                            seed=46)
         file = os.path.join(os.getcwd(),
                             "tests",
                             "__statics",
                             "test_run_results.csv")
 
         actual_run_results = pd.read_csv(file, index_col="time")
-        self.experiment.resting_state()
-        self.experiment.run(repeat=10, time_end=1.0, time_save=0.0005,
-                            save_transitions=["Transition 1", "Transition 2"])
+        experiment.resting_state()
+        experiment.run(repeat=10, time_end=1.0, time_save=0.0005,
+                       save_transitions=["Transition 1", "Transition 2"])
 
-        self.assertIsInstance(self.experiment.get_results(), pd.DataFrame)
+        self.assertIsInstance(experiment.get_results(), pd.DataFrame)
 
         assert_frame_equal(
-            self.experiment.get_results(mean=True), actual_run_results)
+            experiment.get_results(mean=True), actual_run_results)
+
+    def test_seed(self) -> None:
+        results = []
+        for _ in range(2):
+            experiment = Solver(model=self.model, stimulation=self.protocol,
+                                seed=7)
+            experiment.resting_state()
+            experiment.run(repeat=3, time_end=0.5, time_save=0.001)
+            results.append(experiment.get_results())
+
+        assert_frame_equal(results[0], results[1])
 
     def test_number_vesicles_final(self) -> None:
         self.experiment.resting_state()
@@ -121,6 +157,132 @@ class TestSolver(unittest.TestCase):
 
         self.assertTrue(transition_set.issubset(set(results.columns)))
 
+    def test_tau_leap(self) -> None:
+        self.experiment.resting_state()
+        self.experiment.run(repeat=2, time_end=1.0, time_save=0.001,
+                            method="tau_leap", tau=0.0002,
+                            save_transitions=["Transition 1"])
+        results = self.experiment.get_results()
+        states = ["Docked", "Fusion"]
+
+        self.assertEqual(len(results), 2 * 1001)
+        self.assertTrue((results[states] >= 0).all().all())
+        self.assertTrue((results[states].sum(axis=1) == 100).all())
+        self.assertGreater(results["Transition 1"].sum(), 0)
+
+    def test_tau_leap_not_positive(self) -> None:
+        self.experiment.resting_state()
+
+        for tau in (0.0, -0.001):
+            self.assertRaises(ValueError, self.experiment.run,
+                              method="tau_leap", tau=tau)
+
+    def test_many_transitions(self) -> None:
+        model = KineticModel(name='ring-model', vesicles=100)
+        names = [f"State {i}" for i in range(10)]
+        model.add_transition_states([TransitionState(name=name)
+                                     for name in names])
+
+        transitions = []
+        for i, name in enumerate(names):
+            following = names[(i + 1) % len(names)]
+            forward = RateConstant(name=f"k{i}+", value=5.0,
+                                   calcium_dependent=(i == 0))
+            backward = RateConstant(name=f"k{i}-", value=2.0)
+
+            transitions += [Transition(name=f"Forward {i}",
+                                       rate_constant=forward,
+                                       origin=name, destination=following),
+                            Transition(name=f"Backward {i}",
+                                       rate_constant=backward,
+                                       origin=following, destination=name)]
+        model.add_transitions(transitions)
+        model.init()
+
+        experiment = Solver(model=model, stimulation=self.protocol, seed=3)
+        experiment.resting_state(time_end=60.0, window_width=500,
+                                 tolerance=10.0)
+        experiment.run(repeat=2, time_end=1.0, time_save=0.001)
+        results = experiment.get_results()
+
+        self.assertTrue((results[names] >= 0).all().all())
+        self.assertTrue((results[names].sum(axis=1) == 100).all())
+
+    def test_many_transitions_absorbing(self) -> None:
+        model = KineticModel(name='chain-model', vesicles=50)
+        names = [f"State {i}" for i in range(21)]
+        model.add_transition_states([TransitionState(name=name)
+                                     for name in names])
+        model.add_transitions([
+            Transition(name=f"Forward {i}",
+                       rate_constant=RateConstant(name=f"k{i}", value=3.0,
+                                                  calcium_dependent=(i == 0)),
+                       origin=names[i], destination=names[i + 1])
+            for i in range(20)])
+        model.init()
+        model.set_resting_state(model.get_current_state())
+
+        for seed in (0, 1):
+            experiment = Solver(model=model, stimulation=self.protocol,
+                                seed=seed)
+            experiment.run(time_end=30.0, time_save=0.01)
+            results = experiment.get_results()
+
+            self.assertTrue((results[names] >= 0).all().all())
+            self.assertEqual(results[names[-1]].iloc[-1], 50)
+
+    def test_customized_lut(self) -> None:
+        def pulse(t):
+            return 50.0 if 0.1 <= t < 0.2 else 0.0
+
+        protocol = Stimulation(type_stimulus="customized", func=pulse)
+        protocol.build_lut(dt=0.001, t_max=0.5)
+
+        experiment = Solver(model=self.model, stimulation=protocol, seed=11)
+        experiment.resting_state()
+        experiment.run(repeat=2, time_end=0.5, time_save=0.001)
+        results = experiment.get_results()
+
+        self.assertTrue((results[["Docked", "Fusion"]].sum(axis=1)
+                         == 100).all())
+
+    def test_global_random_state(self) -> None:
+        def pulse(t):
+            return 50.0 if 0.1 <= t < 0.2 else 0.0
+
+        protocol = Stimulation(type_stimulus="customized", func=pulse)
+        experiment = Solver(model=self.model, stimulation=protocol, seed=5)
+
+        np.random.seed(123)
+        expected = np.random.random(3)
+
+        np.random.seed(123)
+        experiment.resting_state()
+        for method in ("gillespie", "tau_leap"):
+            experiment.run(repeat=2, time_end=0.3, time_save=0.001,
+                           method=method)
+
+        np.testing.assert_array_equal(np.random.random(3), expected)
+
+    def test_absorbing_state(self) -> None:
+        model = KineticModel(name='absorbing-model', vesicles=50)
+        model.add_transition_states([TransitionState(name='Docked'),
+                                     TransitionState(name='Fusion')])
+        gamma = RateConstant(name="γ", value=50.0)
+        model.add_transitions([Transition(name='Transition 1',
+                                          rate_constant=gamma,
+                                          origin="Docked",
+                                          destination="Fusion")])
+        model.init()
+
+        experiment = Solver(model=model, stimulation=self.protocol, seed=7)
+        experiment.resting_state(time_end=10.0, window_width=100)
+        experiment.run(repeat=2, time_end=0.5, time_save=0.001)
+        results = experiment.get_results()
+
+        self.assertTrue((results['Docked'] == 0).all())
+        self.assertTrue((results['Fusion'] == 50).all())
+
 
 if __name__ == '__main__':
     unittest.main()
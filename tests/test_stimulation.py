@@ -1,8 +1,11 @@
+import copy
+import math
+import pickle
 import unittest
 from unittest.mock import patch
 
 import numpy as np
-from kineuron import Stimulation
+from kineuron import CustomStimulation, ExpDecayStimulation, Stimulation
 
 
 class TestStimulation(unittest.TestCase):
@@ -30,6 +33,47 @@ class TestStimulation(unittest.TestCase):
         with self.assertRaises(AssertionError):
             Stimulation(type_stimulus="customized")
 
+    def test_subclasses(self) -> None:
+        customized = Stimulation(type_stimulus="customized",
+                                 func=lambda t: 0.0)
+
+        self.assertIsInstance(self.stimulation, ExpDecayStimulation)
+        self.assertIsInstance(customized, CustomStimulation)
+        self.assertIsInstance(customized, Stimulation)
+
+    def test_contradictory_arguments(self) -> None:
+        with self.assertRaises(ValueError):
+            ExpDecayStimulation(type_stimulus="customized",
+                                func=lambda t: 0.0)
+
+        with self.assertRaises(ValueError):
+            Stimulation(func=lambda t: 0.0, **self.parameters)
+
+        with self.assertRaises(ValueError):
+            CustomStimulation(type_stimulus="exponential_decay",
+                              func=lambda t: 0.0)
+
+    def test_abstract_stimuli(self) -> None:
+        class Incomplete(Stimulation):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete(name="Protocol", type_stimulus="incomplete")
+
+    def test_missing_arguments(self) -> None:
+        del self.parameters["tau_stimulus"]
+        with self.assertRaises(ValueError):
+            Stimulation(**self.parameters)
+
+    def test_single_conditional_stimulus(self) -> None:
+        self.parameters["conditional_stimuli"] = 1
+        del self.parameters["period"]
+        stimulation = Stimulation(**self.parameters)
+
+        self.assertAlmostEqual(stimulation.stimuli(0.1), 100.0)
+        self.assertAlmostEqual(stimulation.stimuli(0.15), 100.0 * math.exp(-1))
+        self.assertAlmostEqual(stimulation.stimuli(0.25), 100.0)
+
     def test_stimuli(self) -> None:
         actual = np.array([100.0,
                            41.111229050718734,
@@ -47,6 +91,62 @@ class TestStimulation(unittest.TestCase):
 
         np.testing.assert_almost_equal(actual, desired)
 
+    def test_stimuli_array(self) -> None:
+        t = np.linspace(0.0, 1.0, 1001)
+        desired = np.array([self.stimulation.stimuli(x) for x in t])
+
+        np.testing.assert_allclose(self.stimulation.stimuli_array(t),
+                                   desired, rtol=1e-12)
+
+    def test_stimuli_array_customized(self) -> None:
+        def func(t):
+            return 2.0 * t
+
+        stimulation = Stimulation(type_stimulus="customized", func=func)
+        t = np.linspace(0.0, 1.0, 11)
+
+        np.testing.assert_allclose(stimulation.stimuli_array(t), 2.0 * t)
+
+    def test_stimuli_array_customized_scalar(self) -> None:
+        def func(t):
+            return math.exp(-t) if t > 0.5 else 0.0
+
+        stimulation = Stimulation(type_stimulus="customized", func=func)
+        t = np.linspace(0.0, 1.0, 11)
+
+        np.testing.assert_allclose(stimulation.stimuli_array(t),
+                                   [func(x) for x in t])
+
+    def test_build_lut(self) -> None:
+        self.stimulation.build_lut(dt=1e-5, t_max=1.0)
+        t = np.linspace(0.0, 1.2, 997)
+
+        # The rise of each stimulus is smoothed over one step of the table.
+        onsets = np.array([0.1, 0.2, 0.3, 0.45])
+        t = t[np.abs(t[:, None] - onsets).min(axis=1) > 2e-5]
+        desired = np.array([self.stimulation.stimuli(x) for x in t])
+        actual = np.array([self.stimulation.stimuli_lut(x) for x in t])
+
+        self.assertEqual(self.stimulation._lut.shape, (100001,))
+        np.testing.assert_allclose(actual, desired, atol=0.05)
+
+    def test_pickle(self) -> None:
+        t = np.linspace(0.0, 1.0, 101)
+
+        for protocol in (self.stimulation, copy.deepcopy(self.stimulation)):
+            for lut in (False, True):
+                if lut:
+                    protocol.build_lut(dt=1e-3, t_max=1.0)
+
+                # The compiled protocol is built before pickling.
+                protocol._compiled_stimuli
+                actual = pickle.loads(pickle.dumps(protocol))
+
+                self.assertEqual(actual.get_name(), "Protocol")
+                np.testing.assert_array_equal(actual.stimuli_array(t),
+                                              protocol.stimuli_array(t))
+                self.assertEqual(actual._lut is None, not lut)
+
     @patch("kineuron.stimulation.plt")
     def test_plot(self, mock_plt) -> None:
         t = np.linspace(0.1, 0.5, 10)